@@ -4,62 +4,369 @@ Generate a knowledge graph visualization from literature results.
 """
 
 import argparse
+import hashlib
+import itertools
 import json
+import os
+import random
+import re
 import sys
+from collections import Counter
 from pathlib import Path
 
 
-def load_papers(filepath):
-    """Load papers from JSON file."""
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "papers" in data:
-                return data["papers"]
-            elif isinstance(data, list):
-                return data
-            return []
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error loading file: {e}", file=sys.stderr)
-        return []
-
-
-def extract_keywords(papers, top_n=50):
-    """Extract most common keywords from paper titles and abstracts."""
-    from collections import Counter
-    import re
-
-    stopwords = {
-        "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-        "of", "with", "by", "from", "as", "is", "was", "are", "were", "been",
-        "be", "have", "has", "had", "do", "does", "did", "will", "would",
-        "could", "should", "may", "might", "must", "shall", "can", "need",
-        "this", "that", "these", "those", "it", "its", "they", "them", "their",
-        "we", "our", "you", "your", "he", "she", "him", "her", "his",
-        "study", "research", "paper", "using", "based", "approach", "method"
-    }
+class _JSONStream:
+    """Incremental reader over a JSON file using raw_decode on buffered chunks."""
+
+    # Characters that can follow a complete value
+    DELIMITERS = frozenset(" \t\r\n,:]}")
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read another chunk, dropping already consumed text. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        """Consume the next non-whitespace character, which must be char."""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def decode(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number or literal cut at the buffer edge can still decode as a
+            # shorter value (e.g., "1.5" from "1.5e10"), so only accept a value
+            # followed by a delimiter or the end of the input
+            if end == len(self.buf) or self.buf[end] not in self.DELIMITERS:
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_papers(filepath):
+    """
+    Stream papers from a JSON file without loading it whole.
+
+    Accepts a top-level list of papers or an object with a "papers" list
+    (as written by the search and aggregate scripts). Papers are yielded
+    one at a time, so callers can stop early.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        stream = _JSONStream(f)
+        first = stream.peek()
+        if first == "[":
+            yield from stream.iter_array()
+        elif first == "{":
+            stream.expect("{")
+            if stream.peek() == "}":
+                return
+            while True:
+                key = stream.decode()
+                stream.expect(":")
+                if key == "papers" and stream.peek() == "[":
+                    yield from stream.iter_array()
+                    return
+                stream.decode()  # Skip metadata values
+                if stream.peek() == ",":
+                    stream.pos += 1
+                    continue
+                stream.expect("}")
+                return
+
+
+def reservoir_sample(papers, k, stratify=None, seed=None):
+    """
+    Draw a uniform random sample of k papers in a single pass.
+
+    Args:
+        papers: Iterable of paper dictionaries
+        k: Sample size
+        stratify: Optional paper field ("year" or "source") to stratify by;
+            each stratum keeps its own reservoir and the final sample is
+            allocated proportionally to stratum sizes
+        seed: Random seed for reproducible samples
+
+    Returns:
+        Tuple of (sampled papers, number of papers scanned)
+    """
+    rng = random.Random(seed)
+    reservoirs = {}
+    counts = {}
+    total = 0
 
-    words = []
     for paper in papers:
-        # Combine title and abstract
-        text = ""
-        if paper.get("title"):
-            text += paper["title"] + " "
-        if paper.get("abstract"):
-            text += str(paper["abstract"]) + " "
+        total += 1
+        stratum = paper.get(stratify) if stratify else None
+        reservoir = reservoirs.setdefault(stratum, [])
+        counts[stratum] = counts.get(stratum, 0) + 1
+        if len(reservoir) < k:
+            reservoir.append(paper)
+        else:
+            j = rng.randrange(counts[stratum])
+            if j < k:
+                reservoir[j] = paper
+
+    if total <= k:
+        return [p for r in reservoirs.values() for p in r], total
+    if not stratify:
+        return reservoirs[None], total
+
+    # Largest-remainder proportional allocation across strata
+    quotas = {s: k * c / total for s, c in counts.items()}
+    alloc = {s: int(q) for s, q in quotas.items()}
+    remaining = k - sum(alloc.values())
+    for s in sorted(quotas, key=lambda s: quotas[s] - alloc[s], reverse=True)[:remaining]:
+        alloc[s] += 1
+
+    sample = []
+    for stratum, reservoir in reservoirs.items():
+        sample.extend(rng.sample(reservoir, alloc[stratum]))
+    return sample, total
+
+
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "as", "is", "was", "are", "were", "been",
+    "be", "have", "has", "had", "do", "does", "did", "will", "would",
+    "could", "should", "may", "might", "must", "shall", "can", "need",
+    "this", "that", "these", "those", "it", "its", "they", "them", "their",
+    "we", "our", "you", "your", "he", "she", "him", "her", "his",
+    "study", "research", "paper", "using", "based", "approach", "method"
+}
+
+# Number of papers kept in the citation-ordered index of the stats sidecar
+TOP_CITED_SIZE = 100
+
+# Bump when the sidecar layout changes so old sidecars are rebuilt
+STATS_VERSION = 1
+
+
+def paper_keywords(paper):
+    """Extract keyword tokens from a paper's title and abstract."""
+    # Combine title and abstract
+    text = ""
+    if paper.get("title"):
+        text += paper["title"] + " "
+    if paper.get("abstract"):
+        text += str(paper["abstract"]) + " "
+
+    # Extract words
+    tokens = re.findall(r'\b[a-z]{3,}\b', text.lower())
+    return [w for w in tokens if w not in STOPWORDS]
+
+
+def empty_stats():
+    """Return empty corpus statistics."""
+    return {
+        "paper_count": 0,
+        "keywords": {},
+        "years": {},
+        "sources": {},
+        "top_cited": []
+    }
+
 
-        # Extract words
-        tokens = re.findall(r'\b[a-z]{3,}\b', text.lower())
-        words.extend([w for w in tokens if w not in stopwords])
+def add_papers_to_stats(stats, papers):
+    """
+    Fold papers into corpus statistics in place.
 
-    # Count and get top keywords
-    word_counts = Counter(words)
-    return word_counts.most_common(top_n)
+    Keyword, year and source counts are summed; the citation-ordered index
+    keeps the TOP_CITED_SIZE most cited papers.
+    """
+    keywords = Counter(stats["keywords"])
+    years = stats["years"]
+    sources = stats["sources"]
+    cited = list(stats["top_cited"])
+
+    for paper in papers:
+        stats["paper_count"] += 1
+        keywords.update(paper_keywords(paper))
+
+        year = paper.get("year")
+        if year:
+            years[str(year)] = years.get(str(year), 0) + 1
+
+        source = str(paper.get("source", "unknown"))
+        sources[source] = sources.get(source, 0) + 1
+
+        cited.append({
+            "title": paper.get("title") or "Unknown",
+            "citation_count": paper.get("citation_count") or 0
+        })
+        if len(cited) >= 2 * TOP_CITED_SIZE:
+            cited.sort(key=lambda p: p["citation_count"], reverse=True)
+            del cited[TOP_CITED_SIZE:]
+
+    cited.sort(key=lambda p: p["citation_count"], reverse=True)
+    stats["keywords"] = dict(keywords)
+    stats["top_cited"] = cited[:TOP_CITED_SIZE]
+    return stats
+
+
+def compute_stats(papers):
+    """Compute corpus statistics from scratch."""
+    return add_papers_to_stats(empty_stats(), papers)
+
+
+def stats_path(filepath):
+    """Path of the statistics sidecar stored next to a corpus file."""
+    return str(Path(filepath).with_suffix(".stats.json"))
+
+
+def file_sha256(filepath):
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scan_corpus(filepath, cached):
+    """
+    Stream the corpus and fold it into statistics.
+
+    When cached statistics are given and the corpus still starts with the
+    same papers they were built from, only the appended papers are counted.
+    Returns (stats, papers_sha256), or None if the cached prefix no longer
+    matches.
+    """
+    base_count = cached["stats"]["paper_count"] if cached else 0
+    stats = json.loads(json.dumps(cached["stats"])) if cached else empty_stats()
+    hasher = hashlib.sha256()
+    appended = []
+    seen = 0
+
+    for paper in iter_papers(filepath):
+        seen += 1
+        hasher.update(json.dumps(paper, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        if seen <= base_count:
+            if seen == base_count and hasher.hexdigest() != cached["papers_sha256"]:
+                return None
+            continue
+        appended.append(paper)
+        if len(appended) >= 10000:
+            add_papers_to_stats(stats, appended)
+            appended = []
+
+    if seen < base_count:
+        return None  # Papers were removed
+    add_papers_to_stats(stats, appended)
+    return stats, hasher.hexdigest()
+
+
+def load_corpus_stats(filepath):
+    """
+    Return statistics for a corpus file, using its sidecar when possible.
+
+    The sidecar is reused as-is when the corpus is unchanged (same size and
+    mtime, or same content hash), updated incrementally when papers were
+    appended, and rebuilt otherwise.
+    """
+    sidecar = stats_path(filepath)
+    st = os.stat(filepath)
+
+    cached = None
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") != STATS_VERSION:
+                cached = None
+        except (json.JSONDecodeError, OSError):
+            cached = None
+
+    if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime:
+        return cached["stats"]
+
+    content_hash = file_sha256(filepath)
+    if cached and cached["sha256"] == content_hash:
+        scanned = (cached["stats"], cached["papers_sha256"])
+        print(f"Stats sidecar up to date: {sidecar}")
+    else:
+        scanned = _scan_corpus(filepath, cached) if cached else None
+        if scanned:
+            added = scanned[0]["paper_count"] - cached["stats"]["paper_count"]
+            print(f"Updated stats sidecar with {added} appended papers: {sidecar}")
+        else:
+            scanned = _scan_corpus(filepath, None)
+            print(f"Built stats sidecar: {sidecar}")
+
+    stats, papers_hash = scanned
+    tmp_path = f"{sidecar}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": STATS_VERSION,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "sha256": content_hash,
+            "papers_sha256": papers_hash,
+            "stats": stats
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, sidecar)
+    return stats
 
 
 def generate_simple_graph(papers, output_path):
     """Generate a simple ASCII/text knowledge graph."""
-    keywords = extract_keywords(papers, top_n=20)
+    render_stats(compute_stats(papers), output_path)
+
+
+def render_stats(stats, output_path):
+    """Render the text report and plots from corpus statistics."""
+    keywords = Counter(stats["keywords"]).most_common(20)
+    years = {y: stats["years"][y] for y in sorted(stats["years"])}
+    sources = stats["sources"]
+    sorted_papers = stats["top_cited"]
 
     lines = []
     lines.append("=" * 60)
@@ -78,24 +385,17 @@ def generate_simple_graph(papers, output_path):
     # Papers by year
     lines.append("PUBLICATION TIMELINE:")
     lines.append("-" * 40)
-    years = {}
-    for paper in papers:
-        year = paper.get("year")
-        if year:
-            years[year] = years.get(year, 0) + 1
-
-    for year in sorted(years.keys()):
-        bar = "█" * min(years[year], 20)
-        lines.append(f"{year}: {bar} ({years[year]})")
+    for year, count in years.items():
+        bar = "█" * min(count, 20)
+        lines.append(f"{year}: {bar} ({count})")
     lines.append("")
 
     # Top cited papers
     lines.append("TOP CITED PAPERS:")
     lines.append("-" * 40)
-    sorted_papers = sorted(papers, key=lambda p: p.get("citation_count", 0), reverse=True)
     for i, paper in enumerate(sorted_papers[:10], 1):
-        title = paper.get("title", "Unknown")[:40]
-        citations = paper.get("citation_count", 0)
+        title = paper["title"][:40]
+        citations = paper["citation_count"]
         lines.append(f"{i}. {title}... ({citations} citations)")
 
     lines.append("")
@@ -127,7 +427,8 @@ def generate_simple_graph(papers, output_path):
 
         # 2. Publication timeline
         ax2 = axes[0, 1]
-        ax2.bar(years.keys(), years.values(), color="steelblue")
+        ax2.bar([int(y) if y.isdigit() else y for y in years], years.values(),
+                color="steelblue")
         ax2.set_xlabel("Year")
         ax2.set_ylabel("Papers")
         ax2.set_title("Publication Timeline")
@@ -135,8 +436,8 @@ def generate_simple_graph(papers, output_path):
         # 3. Top cited papers
         ax3 = axes[1, 0]
         top_papers = sorted_papers[:10]
-        titles = [p.get("title", "")[:30] for p in top_papers]
-        citations = [p.get("citation_count", 0) for p in top_papers]
+        titles = [p["title"][:30] for p in top_papers]
+        citations = [p["citation_count"] for p in top_papers]
         colors3 = cm.Reds([c/max(citations) if max(citations) > 0 else 0 for c in citations])
         ax3.barh(titles[::-1], citations[::-1], color=colors3[::-1])
         ax3.set_xlabel("Citations")
@@ -144,10 +445,6 @@ def generate_simple_graph(papers, output_path):
 
         # 4. Source distribution
         ax4 = axes[1, 1]
-        sources = {}
-        for paper in papers:
-            source = paper.get("source", "unknown")
-            sources[source] = sources.get(source, 0) + 1
         ax4.pie(sources.values(), labels=sources.keys(), autopct="%1.1f%%",
                colors=plt.cm.Set3.colors[:len(sources)])
         ax4.set_title("Sources")
@@ -160,33 +457,83 @@ def generate_simple_graph(papers, output_path):
         print("Note: matplotlib not available. Text version generated.")
 
 
+def positive_int(value):
+    """Argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate knowledge graph from literature results"
     )
     parser.add_argument("input_file", help="Input JSON file with papers")
     parser.add_argument("--output", "-o", help="Output image file (PNG)")
-    parser.add_argument("--max-papers", type=int, default=100,
-                       help="Maximum papers to include")
+    parser.add_argument("--max-papers", type=positive_int,
+                       help="Maximum papers to include (default: 100)")
+    parser.add_argument("--sample", action="store_true",
+                       help="Reservoir-sample --max-papers papers from the whole file "
+                            "instead of taking the first ones")
+    parser.add_argument("--stratify", choices=["year", "source"],
+                       help="Stratify --sample by paper year or source")
+    parser.add_argument("--seed", type=int, help="Random seed for --sample")
+    parser.add_argument("--stats-cache", action="store_true",
+                       help="Render the whole corpus from a statistics sidecar "
+                            "(<input>.stats.json), built or updated as needed")
 
     args = parser.parse_args()
 
+    if args.stats_cache:
+        # The sidecar always describes the whole corpus
+        if args.max_papers is not None or args.sample or args.stratify:
+            parser.error("--stats-cache renders the whole corpus and cannot be combined "
+                         "with --max-papers, --sample or --stratify")
+    elif args.max_papers is None:
+        args.max_papers = 100
+    if (args.stratify or args.seed is not None) and not args.sample:
+        parser.error("--stratify and --seed only apply with --sample")
+
     # Determine output path
     output_path = args.output
     if not output_path:
         input_name = Path(args.input_file).stem
         output_path = f"{input_name}_knowledge_graph.png"
 
-    # Load papers
-    papers = load_papers(args.input_file)
+    if args.stats_cache:
+        try:
+            stats = load_corpus_stats(args.input_file)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error loading file: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not stats["paper_count"]:
+            print("No papers found in input file", file=sys.stderr)
+            sys.exit(1)
+        print(f"Rendering statistics for {stats['paper_count']} papers")
+        render_stats(stats, output_path)
+        return
+
+    # Stream papers, stopping at the cap unless sampling the whole file
+    try:
+        if args.sample:
+            papers, scanned = reservoir_sample(
+                iter_papers(args.input_file),
+                args.max_papers,
+                stratify=args.stratify,
+                seed=args.seed
+            )
+            print(f"Scanned {scanned} papers")
+        else:
+            papers = list(itertools.islice(iter_papers(args.input_file), args.max_papers))
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error loading file: {e}", file=sys.stderr)
+        papers = []
+
     if not papers:
         print("No papers found in input file", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Loaded {len(papers)} papers")
-
-    # Limit papers
-    papers = papers[:args.max_papers]
     print(f"Processing {len(papers)} papers")
 
     # Generate graph
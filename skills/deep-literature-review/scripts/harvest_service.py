@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Local harvest service backed by a persistent SQLite job queue.
+
+Searches are enqueued as jobs and expanded into page jobs (and optional
+hydration jobs) that a pool of worker processes runs through the search
+scripts. Jobs have priorities and leases, identical pending requests are
+coalesced, failed requests are retried, and papers are written to the
+database as each page completes, so work survives crashes and restarts.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from multiprocessing import Process
+
+from search_common import SOURCES, fetch_page, paper_key
+from search_semantic_scholar import fetch_semantic_scholar_paper
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    parent_id INTEGER,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    result_count INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, status);
+CREATE INDEX IF NOT EXISTS jobs_parent ON jobs (parent_id);
+CREATE TABLE IF NOT EXISTS job_roots (
+    job_id INTEGER NOT NULL,
+    root_id INTEGER NOT NULL,
+    PRIMARY KEY (job_id, root_id)
+);
+CREATE INDEX IF NOT EXISTS job_roots_root ON job_roots (root_id);
+CREATE TABLE IF NOT EXISTS job_reviews (
+    job_id INTEGER NOT NULL,
+    review TEXT NOT NULL,
+    PRIMARY KEY (job_id, review)
+);
+CREATE TABLE IF NOT EXISTS papers (
+    key TEXT PRIMARY KEY,
+    source TEXT,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_papers (
+    job_id INTEGER NOT NULL,
+    paper_key TEXT NOT NULL,
+    PRIMARY KEY (job_id, paper_key)
+);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    source TEXT PRIMARY KEY,
+    next_time REAL NOT NULL
+);
+"""
+
+# Seconds a worker may hold a job before another worker can reclaim it
+LEASE_SECONDS = 300
+
+# Attempts before a job is marked failed
+MAX_ATTEMPTS = 5
+
+
+def connect(db_path):
+    """Open the queue database, creating the schema if needed."""
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def job_dedup_key(kind, source, params):
+    """Identity of a request, used to coalesce identical jobs."""
+    canonical = json.dumps([kind, source, params], sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def enqueue(conn, kind, source, params, priority=0, parent_id=None, review=None):
+    """
+    Add a job, or coalesce it with an identical pending or running job.
+
+    Every job records the searches it serves in job_roots. A job enqueued
+    by a parent inherits the parent's roots; when it is coalesced, those
+    roots are added to the existing job and to every job it has spawned,
+    so each review still exports the pages fetched on its behalf.
+
+    Returns:
+        Tuple of (job id, whether the job was coalesced)
+    """
+    key = job_dedup_key(kind, source, params)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id, priority FROM jobs WHERE dedup_key = ? "
+            "AND status IN ('pending', 'leased') ORDER BY id LIMIT 1",
+            (key,)
+        ).fetchone()
+        if row:
+            job_id = row["id"]
+            if priority > row["priority"]:
+                conn.execute("UPDATE jobs SET priority = ? WHERE id = ?", (priority, job_id))
+            if parent_id is not None:
+                conn.execute(
+                    "WITH RECURSIVE tree(id) AS ("
+                    "SELECT ? UNION SELECT j.id FROM jobs j JOIN tree t ON j.parent_id = t.id) "
+                    "INSERT OR IGNORE INTO job_roots (job_id, root_id) "
+                    "SELECT tree.id, r.root_id FROM tree, job_roots r WHERE r.job_id = ?",
+                    (job_id, parent_id)
+                )
+        else:
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, source, params, dedup_key, parent_id, priority, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, source, json.dumps(params), key, parent_id, priority, time.time())
+            ).lastrowid
+            if parent_id is None:
+                conn.execute("INSERT INTO job_roots (job_id, root_id) VALUES (?, ?)",
+                             (job_id, job_id))
+            else:
+                conn.execute(
+                    "INSERT INTO job_roots (job_id, root_id) "
+                    "SELECT ?, root_id FROM job_roots WHERE job_id = ?",
+                    (job_id, parent_id)
+                )
+        if review:
+            conn.execute("INSERT OR IGNORE INTO job_reviews (job_id, review) VALUES (?, ?)",
+                         (job_id, review))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return job_id, row is not None
+
+
+def claim_job(conn):
+    """Lease the highest-priority runnable job, or return None if there is none."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # A job whose worker keeps dying is given up, like one that keeps failing
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, lease_until = NULL, "
+            "error = COALESCE(error, 'lease expired') "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, now, MAX_ATTEMPTS)
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE (status = 'pending' AND available_at <= ?) "
+            "OR (status = 'leased' AND lease_until < ?) "
+            "ORDER BY priority DESC, id LIMIT 1",
+            (now, now)
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (now + LEASE_SECONDS, row["id"])
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def wait_for_rate_limit(conn, source):
+    """Reserve the next request slot for a source, shared by all workers."""
+    interval = SOURCES[source]["interval"]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        now = time.time()
+        row = conn.execute("SELECT next_time FROM rate_limits WHERE source = ?",
+                           (source,)).fetchone()
+        slot = max(now, row["next_time"]) if row else now
+        conn.execute("INSERT OR REPLACE INTO rate_limits (source, next_time) VALUES (?, ?)",
+                     (source, slot + interval))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def store_papers(conn, job_id, papers):
+    """Write a page of papers and link them to the job that fetched them."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for paper in papers:
+            key = paper_key(paper)
+            conn.execute(
+                "INSERT OR IGNORE INTO papers (key, source, data, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, paper.get("source"), json.dumps(paper, ensure_ascii=False), now)
+            )
+            conn.execute("INSERT OR IGNORE INTO job_papers (job_id, paper_key) VALUES (?, ?)",
+                         (job_id, key))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def run_job(conn, job):
+    """
+    Run a leased job.
+
+    Returns:
+        Number of papers written
+
+    Raises:
+        RuntimeError: if the request failed and the job should be retried
+    """
+    params = json.loads(job["params"])
+    source = job["source"]
+
+    if job["kind"] == "search":
+        # Expand into the first page; each full page enqueues the next one
+        enqueue(conn, "page", source, dict(params, offset=0),
+                priority=job["priority"], parent_id=job["id"])
+        return 0
+
+    stats = {}
+    wait_for_rate_limit(conn, source)
+
+    if job["kind"] == "hydrate":
+        paper = fetch_semantic_scholar_paper(params["lookup_id"], stats=stats)
+        if stats.get("status") == 404:
+            # Not indexed on Semantic Scholar; retrying will not change that
+            return 0
+        if not stats.get("requests"):
+            raise RuntimeError(f"hydration request failed for {params['lookup_id']}")
+        if paper:
+            row = conn.execute("SELECT data FROM papers WHERE key = ?",
+                               (params["paper_key"],)).fetchone()
+            if row:
+                stored = json.loads(row["data"])
+                stored["citation_count"] = (paper.get("citation_count")
+                                            or stored.get("citation_count", 0))
+                stored["abstract"] = stored.get("abstract") or paper.get("abstract")
+                stored["semantic_scholar_id"] = paper.get("paper_id")
+                conn.execute("UPDATE papers SET data = ? WHERE key = ?",
+                             (json.dumps(stored, ensure_ascii=False), params["paper_key"]))
+        return 1 if paper else 0
+
+    limit = min(params["limit"], SOURCES[source]["ceiling"])
+    page_size = min(SOURCES[source]["page_size"], limit - params["offset"])
+    papers = fetch_page(source, params["query"], params["offset"], page_size, stats=stats,
+                        year=params.get("year"), categories=params.get("categories"),
+                        field=params.get("field"))
+    # The search functions report errors by returning nothing; a page that
+    # got no response at all is a failed request
+    if not stats.get("requests"):
+        raise RuntimeError(f"{source} request failed at offset {params['offset']}")
+
+    store_papers(conn, job["id"], papers)
+
+    next_offset = params["offset"] + page_size
+    if len(papers) == page_size and next_offset < limit:
+        enqueue(conn, "page", source, dict(params, offset=next_offset),
+                priority=job["priority"], parent_id=job["id"])
+
+    if params.get("hydrate"):
+        for paper in papers:
+            if paper.get("source") == "arxiv" and paper.get("paper_id"):
+                # Strip the version suffix (e.g., 2106.15928v2) for the lookup
+                arxiv_id = re.sub(r"v\d+$", "", paper["paper_id"])
+                enqueue(conn, "hydrate", "semantic_scholar",
+                        {"paper_key": paper_key(paper), "lookup_id": f"arXiv:{arxiv_id}"},
+                        priority=job["priority"] - 1, parent_id=job["id"])
+
+    return len(papers)
+
+
+def finish_job(conn, job, result_count=None, error=None):
+    """Mark a job done, or schedule a retry with backoff after an error."""
+    now = time.time()
+    if error is None:
+        conn.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, result_count = ?, "
+            "lease_until = NULL, error = NULL WHERE id = ?",
+            (now, result_count, job["id"])
+        )
+    elif job["attempts"] + 1 >= MAX_ATTEMPTS:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, lease_until = NULL, "
+            "error = ? WHERE id = ?",
+            (now, error, job["id"])
+        )
+    else:
+        backoff = min(300, 5 * 2 ** job["attempts"])
+        conn.execute(
+            "UPDATE jobs SET status = 'pending', available_at = ?, lease_until = NULL, "
+            "error = ? WHERE id = ?",
+            (now + backoff, error, job["id"])
+        )
+
+
+def worker_loop(db_path, worker_name, drain=False, poll_interval=2.0):
+    """Claim and run jobs until stopped (or until the queue is empty with drain)."""
+    conn = connect(db_path)
+    while True:
+        job = claim_job(conn)
+        if job is None:
+            if drain and not queue_has_work(conn):
+                break
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            count = run_job(conn, job)
+        except Exception as e:
+            print(f"{worker_name}: job {job['id']} failed: {e}", file=sys.stderr)
+            finish_job(conn, job, error=str(e))
+        else:
+            finish_job(conn, job, result_count=count)
+    conn.close()
+
+
+def queue_has_work(conn):
+    """Whether any job is pending or still leased."""
+    row = conn.execute(
+        "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+    ).fetchone()
+    return row[0] > 0
+
+
+def queue_stats(conn, window=600):
+    """
+    Summarise queue depth and recent throughput.
+
+    Args:
+        conn: Queue database connection
+        window: Seconds of history used for throughput
+
+    Returns:
+        Dictionary of statistics
+    """
+    now = time.time()
+    by_status = {}
+    for row in conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"):
+        by_status.setdefault(row["kind"], {})[row["status"]] = row["n"]
+
+    # Only page jobs fetch papers; hydrations enrich papers already counted
+    recent = conn.execute(
+        "SELECT COUNT(*) AS jobs, "
+        "COALESCE(SUM(CASE WHEN kind = 'page' THEN result_count END), 0) AS papers, "
+        "COALESCE(SUM(CASE WHEN kind = 'hydrate' THEN result_count END), 0) AS hydrated "
+        "FROM jobs WHERE status = 'done' AND finished_at >= ?",
+        (now - window,)
+    ).fetchone()
+    papers = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+    depth = conn.execute(
+        "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+    ).fetchone()[0]
+
+    return {
+        "queue_depth": depth,
+        "jobs": by_status,
+        "papers_stored": papers,
+        "window_seconds": window,
+        "jobs_per_minute": round(recent["jobs"] * 60 / window, 2),
+        "papers_per_minute": round(recent["papers"] * 60 / window, 2),
+        "hydrations_per_minute": round(recent["hydrated"] * 60 / window, 2)
+    }
+
+
+def export_review(conn, review):
+    """Return the papers harvested for a review."""
+    rows = conn.execute(
+        "SELECT DISTINCT p.data FROM job_reviews r "
+        "JOIN job_roots jr ON jr.root_id = r.job_id "
+        "JOIN job_papers jp ON jp.job_id = jr.job_id "
+        "JOIN papers p ON p.key = jp.paper_key "
+        "WHERE r.review = ?",
+        (review,)
+    )
+    return [json.loads(row["data"]) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Persistent multi-worker harvest queue"
+    )
+    parser.add_argument("--db", default="harvest_queue.sqlite", help="Queue database file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue a search")
+    enqueue_parser.add_argument("query", help="Search query")
+    enqueue_parser.add_argument("--source", required=True, choices=sorted(SOURCES),
+                                help="Database to search")
+    enqueue_parser.add_argument("--review", help="Review name the results belong to")
+    enqueue_parser.add_argument("--year", help="Year range (e.g., 2020-2024)")
+    enqueue_parser.add_argument("--categories", help="arXiv categories (e.g., cs.AI,cs.LG)")
+    enqueue_parser.add_argument("--field", help="Semantic Scholar field of study")
+    enqueue_parser.add_argument("--limit", type=int, default=100, help="Number of results")
+    enqueue_parser.add_argument("--priority", type=int, default=0,
+                                help="Higher priorities run first")
+    enqueue_parser.add_argument("--hydrate", action="store_true",
+                                help="Look up citation counts for arXiv results on Semantic Scholar")
+
+    work_parser = subparsers.add_parser("work", help="Run worker processes")
+    work_parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    work_parser.add_argument("--drain", action="store_true",
+                             help="Exit once the queue is empty")
+
+    stats_parser = subparsers.add_parser("stats", help="Show queue depth and throughput")
+    stats_parser.add_argument("--window", type=int, default=600,
+                              help="Seconds of history for throughput")
+
+    export_parser = subparsers.add_parser("export", help="Export a review's papers")
+    export_parser.add_argument("review", help="Review name")
+    export_parser.add_argument("--output", "-o", help="Output JSON file")
+
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        params = {"query": args.query, "year": args.year, "categories": args.categories,
+                  "field": args.field, "limit": args.limit, "hydrate": args.hydrate}
+        conn = connect(args.db)
+        job_id, coalesced = enqueue(conn, "search", args.source, params,
+                                    priority=args.priority, review=args.review)
+        if coalesced:
+            print(f"Coalesced with pending job {job_id}")
+        else:
+            print(f"Queued job {job_id}")
+
+    elif args.command == "work":
+        connect(args.db).close()  # Create the schema before workers start
+        workers = [
+            Process(target=worker_loop, args=(args.db, f"worker-{i}", args.drain))
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        print(f"Started {len(workers)} workers on {args.db}")
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # Leased jobs are reclaimed after their lease expires
+            for worker in workers:
+                worker.terminate()
+
+    elif args.command == "stats":
+        print(json.dumps(queue_stats(connect(args.db), args.window), indent=2))
+
+    elif args.command == "export":
+        papers = export_review(connect(args.db), args.review)
+        print(f"Found {len(papers)} papers for review {args.review}")
+        output_data = {
+            "review": args.review,
+            "count": len(papers),
+            "papers": papers
+        }
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            print(f"Results saved to {args.output}")
+        else:
+            print(json.dumps(output_data, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
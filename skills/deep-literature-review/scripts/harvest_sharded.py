@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Harvest large result sets by splitting a year range into date shards.
+
+arXiv relevance queries degrade past a few thousand results and Semantic
+Scholar search stops at offset 1000, so a single query cannot reach deep
+into a broad topic. This script splits the range into per-year (or
+per-month) shards, pages through each shard in parallel under a shared
+rate limit, and splits any shard that hits the per-query ceiling in half
+until it fits.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, timedelta
+
+from search_common import SOURCES, fetch_page, paper_key
+
+
+# Sources whose search supports date-range shards
+SHARDED_SOURCES = ["arxiv", "semantic_scholar"]
+
+# Attempts per page before a shard is reported as failed
+FETCH_ATTEMPTS = 3
+
+
+class RateLimiter:
+    """Space out requests shared across worker threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def plan_shards(year_range, granularity="year"):
+    """
+    Split a year range into date shards.
+
+    Args:
+        year_range: Year range (e.g., "2020-2024" or "2020")
+        granularity: "year" or "month"
+
+    Returns:
+        List of (start_date, end_date) tuples, both inclusive
+    """
+    if "-" in str(year_range):
+        start_year, end_year = (int(y) for y in str(year_range).split("-"))
+    else:
+        start_year = end_year = int(year_range)
+
+    shards = []
+    for year in range(start_year, end_year + 1):
+        if granularity == "month":
+            for month in range(1, 13):
+                next_month = date(year + month // 12, month % 12 + 1, 1)
+                shards.append((date(year, month, 1), next_month - timedelta(days=1)))
+        else:
+            shards.append((date(year, 1, 1), date(year, 12, 31)))
+    return shards
+
+
+def split_shard(shard):
+    """Split a shard into two halves, or return None for a single day."""
+    start, end = shard
+    if start >= end:
+        return None
+    mid = start + (end - start) // 2
+    return [(start, mid), (mid + timedelta(days=1), end)]
+
+
+def fetch_shard_page(source, query, shard, offset, size, limiter, options):
+    """
+    Fetch one page of a shard, retrying requests that got no response.
+
+    The search functions print errors and return an empty list, so a page
+    is only trusted when a response was actually read.
+
+    Returns:
+        Tuple of (papers, reported total or None)
+
+    Raises:
+        RuntimeError: if every attempt failed
+    """
+    for attempt in range(FETCH_ATTEMPTS):
+        if attempt:
+            time.sleep(5 * attempt)
+        limiter.wait()
+        stats = {}
+        page = fetch_page(source, query, offset, size, stats=stats, date_from=shard[0],
+                          date_to=shard[1], **options)
+        if stats.get("requests"):
+            return page, stats.get("total")
+    raise RuntimeError(f"no response at offset {offset} after {FETCH_ATTEMPTS} attempts")
+
+
+def harvest_shard(source, query, shard, limiter, options):
+    """
+    Page through a shard until it is exhausted or hits the ceiling.
+
+    The first page reports the total number of matches; a shard with more
+    matches than the ceiling is returned as capped right away so it can be
+    split without paging to the ceiling first.
+
+    Returns:
+        Tuple of (papers, capped) where capped means the ceiling was reached
+    """
+    settings = SOURCES[source]
+    page_size = settings["page_size"]
+    ceiling = settings["ceiling"]
+    papers = []
+    offset = 0
+
+    while offset < ceiling:
+        size = min(page_size, ceiling - offset)
+        page, total = fetch_shard_page(source, query, shard, offset, size, limiter, options)
+        papers.extend(page)
+        if offset == 0 and total is not None and total > ceiling and split_shard(shard):
+            return papers, True
+        offset += size
+        if len(page) < size:
+            return papers, False
+
+    return papers, True
+
+
+def harvest(source, query, year_range, granularity="year", workers=4, **options):
+    """
+    Harvest all results for a query across a year range.
+
+    Args:
+        source: "arxiv" or "semantic_scholar"
+        query: Search query string
+        year_range: Year range (e.g., "2020-2024")
+        granularity: Initial shard size, "year" or "month"
+        workers: Number of shards fetched concurrently
+        **options: Passed through to the search function (categories, field)
+
+    Returns:
+        Tuple of (papers, number of shards harvested, list of failed shard labels)
+    """
+    limiter = RateLimiter(SOURCES[source]["interval"])
+    merged = {}
+    shard_count = 0
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {
+            executor.submit(harvest_shard, source, query, shard, limiter, options): shard
+            for shard in plan_shards(year_range, granularity)
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = pending.pop(future)
+                label = f"{shard[0].isoformat()}..{shard[1].isoformat()}"
+                try:
+                    papers, capped = future.result()
+                except RuntimeError as e:
+                    print(f"Error: shard {label} failed: {e}", file=sys.stderr)
+                    failed.append(label)
+                    continue
+                shard_count += 1
+                for paper in papers:
+                    merged.setdefault(paper_key(paper), paper)
+
+                children = split_shard(shard) if capped else None
+                if children:
+                    print(f"Shard {label} exceeds the ceiling, splitting", file=sys.stderr)
+                    for child in children:
+                        pending[executor.submit(harvest_shard, source, query, child,
+                                                limiter, options)] = child
+                else:
+                    if capped:
+                        print(f"Warning: shard {label} still capped at one day",
+                              file=sys.stderr)
+                    print(f"Shard {label}: {len(papers)} papers "
+                          f"({len(merged)} unique so far)", file=sys.stderr)
+
+    return list(merged.values()), shard_count, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Harvest arXiv or Semantic Scholar results by year shards"
+    )
+    parser.add_argument("query", help="Search query")
+    parser.add_argument("--source", default="arxiv",
+                       choices=SHARDED_SOURCES,
+                       help="Database to harvest")
+    parser.add_argument("--year", required=True, help="Year range (e.g., 2020-2024)")
+    parser.add_argument("--granularity", default="year",
+                       choices=["year", "month"],
+                       help="Initial shard size")
+    parser.add_argument("--workers", type=int, default=4,
+                       help="Shards fetched concurrently")
+    parser.add_argument("--categories", help="arXiv categories (e.g., cs.AI,cs.LG)")
+    parser.add_argument("--field", help="Semantic Scholar field of study")
+    parser.add_argument("--output", "-o", help="Output JSON file")
+
+    args = parser.parse_args()
+
+    print(f"Harvesting {args.source} for: {args.query}")
+    print(f"Year range: {args.year} ({args.granularity} shards)")
+
+    papers, shard_count, failed = harvest(
+        args.source,
+        args.query,
+        args.year,
+        granularity=args.granularity,
+        workers=args.workers,
+        categories=args.categories,
+        field=args.field
+    )
+
+    print(f"Found {len(papers)} papers across {shard_count} shards")
+    if failed:
+        print(f"Warning: {len(failed)} shards failed and are missing from the results: "
+              f"{', '.join(failed)}", file=sys.stderr)
+
+    output_data = {
+        "query": args.query,
+        "source": args.source,
+        "year_range": args.year,
+        "shards": shard_count,
+        "failed_shards": failed,
+        "count": len(papers),
+        "papers": papers
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        print(f"Results saved to {args.output}")
+    else:
+        print(json.dumps(output_data, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
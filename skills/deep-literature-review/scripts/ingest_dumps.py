@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Ingest papers from local OpenAlex snapshot and arXiv metadata dumps.
+
+Reads the OpenAlex works snapshot (gzipped JSONL part files) or the arXiv
+metadata snapshot (JSON lines) with a pool of worker processes, applying
+query, year and category filters during the scan. Records are mapped to
+the same paper dictionaries the search scripts produce.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+from search_openalex import parse_work
+
+
+# File suffixes picked up from directories for each dump format
+DUMP_SUFFIXES = {
+    "openalex": (".gz",),
+    "arxiv": (".json", ".jsonl"),
+}
+
+
+def parse_arxiv_record(record):
+    """Convert an arXiv metadata snapshot record to a paper dictionary."""
+    authors = []
+    for parts in record.get("authors_parsed") or []:
+        name = " ".join(p for p in (parts[1:2] + parts[:1]) if p)
+        if name:
+            authors.append(name)
+    if not authors and record.get("authors"):
+        authors = [a.strip() for a in re.split(r",| and ", record["authors"]) if a.strip()]
+
+    # Year of the first submitted version, as search_arxiv reports
+    year = None
+    versions = record.get("versions") or []
+    if versions:
+        year_match = re.search(r"\b(\d{4})\b", versions[0].get("created", ""))
+        if year_match:
+            year = int(year_match.group(1))
+    if year is None and record.get("update_date"):
+        year = int(record["update_date"][:4])
+
+    arxiv_id = record.get("id", "")
+    return {
+        "title": " ".join((record.get("title") or "").split()),
+        "abstract": (record.get("abstract") or "").strip(),
+        "authors": authors,
+        "year": year,
+        "citation_count": 0,  # arXiv doesn't have citation counts
+        "venue": "arXiv preprint",
+        "url": f"https://arxiv.org/abs/{arxiv_id}",
+        "paper_id": arxiv_id,
+        "categories": (record.get("categories") or "").split(),
+        "source": "arxiv"
+    }
+
+
+def matches(paper, terms, from_year, to_year, categories):
+    """Check a mapped paper against the scan filters."""
+    year = paper.get("year")
+    if from_year and (not year or year < from_year):
+        return False
+    if to_year and (not year or year > to_year):
+        return False
+    if categories:
+        labels = {c.lower() for c in (paper.get("categories") or paper.get("concepts") or []) if c}
+        if not labels & categories:
+            return False
+    if terms:
+        # Whole-word match, so "ai" does not match "said"
+        text = f"{paper.get('title') or ''} {paper.get('abstract') or ''}".lower()
+        words = set(re.findall(r"\w+", text))
+        if not all(term in words for term in terms):
+            return False
+    return True
+
+
+def plan_shards(paths, chunk_size):
+    """
+    Split dump files into shards for the worker pool.
+
+    Gzipped files are one shard each; plain JSON lines files are split into
+    byte ranges of roughly chunk_size so a single large arXiv snapshot is
+    still scanned in parallel.
+    """
+    shards = []
+    for path in paths:
+        if path.endswith(".gz"):
+            shards.append((path, 0, None))
+            continue
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), chunk_size):
+            shards.append((path, start, min(start + chunk_size, size)))
+    return shards
+
+
+def iter_shard_lines(path, start, end):
+    """Yield the lines of a shard; byte-range shards own lines starting inside them."""
+    if end is None:
+        with gzip.open(path, "rb") as f:
+            yield from f
+        return
+
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # Finish the line owned by the previous shard
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def scan_shard(task):
+    """Worker: scan one shard and return (papers, records scanned)."""
+    (path, start, end), fmt, terms, from_year, to_year, categories = task
+    parse = parse_work if fmt == "openalex" else parse_arxiv_record
+    # Non-ASCII terms may be \u-escaped in the raw JSON, so only prefilter on ASCII
+    raw_terms = [t.encode("ascii") for t in terms if t.isascii()]
+    papers = []
+    scanned = 0
+
+    for line in iter_shard_lines(path, start, end):
+        line = line.strip()
+        if not line:
+            continue
+        scanned += 1
+        # Cheap prefilter on the raw line before paying for a JSON parse
+        if raw_terms:
+            lowered = line.lower()
+            if not all(term in lowered for term in raw_terms):
+                continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        paper = parse(record)
+        if matches(paper, terms, from_year, to_year, categories):
+            papers.append(paper)
+
+    return papers, scanned
+
+
+def find_dump_files(inputs, fmt):
+    """Expand input files and directories into dump file paths of a format."""
+    paths = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(str(f) for f in sorted(p.rglob("*"))
+                         if f.is_file() and f.name.endswith(DUMP_SUFFIXES[fmt]))
+        else:
+            paths.append(str(p))
+    return paths
+
+
+def ingest(inputs, fmt, query=None, from_year=None, to_year=None,
+           categories=None, workers=None, chunk_size=64 << 20):
+    """
+    Scan local dump files and return matching papers.
+
+    Args:
+        inputs: Dump files or directories
+        fmt: Dump format ("openalex" or "arxiv")
+        query: Words that must all appear in title or abstract
+        from_year: Start year
+        to_year: End year
+        categories: arXiv categories or OpenAlex concept names (e.g., "cs.AI,cs.LG")
+        workers: Number of worker processes (default: CPU count)
+        chunk_size: Byte size of shards for plain JSON lines files
+
+    Returns:
+        Tuple of (list of paper dictionaries, records scanned)
+    """
+    terms = re.findall(r"\w+", query.lower()) if query else []
+    category_set = {c.strip().lower() for c in categories.split(",")} if categories else set()
+    shards = plan_shards(find_dump_files(inputs, fmt), chunk_size)
+    tasks = [(shard, fmt, terms, from_year, to_year, category_set) for shard in shards]
+
+    papers = []
+    scanned = 0
+    with Pool(processes=workers) as pool:
+        for shard_papers, shard_scanned in pool.imap_unordered(scan_shard, tasks):
+            papers.extend(shard_papers)
+            scanned += shard_scanned
+
+    return papers, scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest papers from local OpenAlex or arXiv bulk dumps"
+    )
+    parser.add_argument("inputs", nargs="+", help="Dump files or directories")
+    parser.add_argument("--format", required=True, choices=["openalex", "arxiv"],
+                       help="Dump format")
+    parser.add_argument("--query", help="Terms that must all appear in title or abstract")
+    parser.add_argument("--from-year", type=int, help="Start year")
+    parser.add_argument("--to-year", type=int, help="End year")
+    parser.add_argument("--categories",
+                       help="arXiv categories or OpenAlex concepts (e.g., cs.AI,cs.LG)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", help="Output JSON file")
+
+    args = parser.parse_args()
+
+    print(f"Ingesting {args.format} dump: {', '.join(args.inputs)}")
+    if args.query:
+        print(f"Query: {args.query}")
+
+    try:
+        papers, scanned = ingest(
+            args.inputs,
+            args.format,
+            query=args.query,
+            from_year=args.from_year,
+            to_year=args.to_year,
+            categories=args.categories,
+            workers=args.workers
+        )
+    except (FileNotFoundError, OSError) as e:
+        print(f"Error reading dump: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Scanned {scanned} records, found {len(papers)} papers")
+
+    output_data = {
+        "query": args.query,
+        "dump_format": args.format,
+        "from_year": args.from_year,
+        "to_year": args.to_year,
+        "categories": args.categories,
+        "count": len(papers),
+        "papers": papers
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        print(f"Results saved to {args.output}")
+    else:
+        print(json.dumps(output_data, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
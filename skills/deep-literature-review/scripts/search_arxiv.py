@@ -6,14 +6,18 @@ Search arXiv for preprints.
 import argparse
 import json
 import sys
+import time
 import urllib.request
 import urllib.parse
 import urllib.error
 import re
 from datetime import datetime
 
+from search_common import read_response
 
-def search_arxiv(query, year=None, categories=None, limit=10):
+
+def search_arxiv(query, year=None, categories=None, limit=10, start=0,
+                 submitted_from=None, submitted_to=None, stats=None):
     """
     Search arXiv API.
 
@@ -22,6 +26,11 @@ def search_arxiv(query, year=None, categories=None, limit=10):
         year: Year range (e.g., "2020-2024")
         categories: arXiv categories (e.g., "cs.AI,cs.LG")
         limit: Maximum number of results
+        start: Offset for pagination
+        submitted_from: Start of submittedDate range (YYYYMMDD), overrides year
+        submitted_to: End of submittedDate range (YYYYMMDD), overrides year
+        stats: Optional dict that accumulates "requests" and "bytes" transferred
+            and records the reported "total" number of matches
 
     Returns:
         List of preprint dictionaries
@@ -31,7 +40,11 @@ def search_arxiv(query, year=None, categories=None, limit=10):
     # Build search query
     search_parts = [f"all:{query}"]
 
-    if year:
+    if submitted_from or submitted_to:
+        search_parts.append(
+            f"submittedDate:[{submitted_from or '19910101'} TO {submitted_to or '30001231'}]"
+        )
+    elif year:
         if "-" in str(year):
             start_year, end_year = year.split("-")
             # arXiv supports submittedDate range
@@ -47,61 +60,78 @@ def search_arxiv(query, year=None, categories=None, limit=10):
 
     params = {
         "search_query": search_query,
-        "start": 0,
-        "max_results": min(limit, 50),  # API limit
         "sortBy": "relevance",
         "sortOrder": "descending"
     }
 
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-
     papers = []
     headers = {
-        "Accept": "application/atom+xml"
+        "Accept": "application/atom+xml",
+        "Accept-Encoding": "gzip"
     }
 
-    try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            xml_content = response.read().decode("utf-8")
-
-            # Simple XML parsing
-            entries = re.findall(r'<entry>(.*?)</entry>', xml_content, re.DOTALL)
-
-            for entry in entries:
-                # Extract fields using regex
-                title_match = re.search(r'<title>(.*?)</title>', entry, re.DOTALL)
-                summary_match = re.search(r'<summary>(.*?)</summary>', entry, re.DOTALL)
-                author_matches = re.findall(r'<name>(.*?)</name>', entry)
-                published_match = re.search(r'<published>(.*?)</published>', entry)
-                id_match = re.search(r'<id>(.*?)</id>', entry)
-                categories_match = re.findall(r'<category term="([^"]+)"', entry)
-
-                title = title_match.group(1).strip() if title_match else ""
-                summary = summary_match.group(1).strip() if summary_match else ""
-                authors = [a.strip() for a in author_matches]
-                published = published_match.group(1)[:10] if published_match else None  # YYYY-MM-DD
-                year = int(published[:4]) if published else None
-                arxiv_id = id_match.group(1).split("/")[-1] if id_match else ""
-                arxiv_url = f"https://arxiv.org/abs/{arxiv_id}"
-
-                papers.append({
-                    "title": title,
-                    "abstract": summary,
-                    "authors": authors,
-                    "year": year,
-                    "citation_count": 0,  # arXiv doesn't have citation counts
-                    "venue": "arXiv preprint",
-                    "url": arxiv_url,
-                    "paper_id": arxiv_id,
-                    "categories": categories_match,
-                    "source": "arxiv"
-                })
-
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
+    # Page until the limit is met or results run out
+    while len(papers) < limit:
+        page_size = min(limit - len(papers), 50)  # API limit
+        params["start"] = start
+        params["max_results"] = page_size
+        url = f"{base_url}?{urllib.parse.urlencode(params)}"
+
+        if papers:
+            time.sleep(3)  # arXiv asks for 3 seconds between requests
+
+        try:
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req, timeout=30) as response:
+                xml_content = read_response(response, stats)
+        except urllib.error.HTTPError as e:
+            print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
+            break
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            break
+
+        # Total matches, used by callers to plan paging
+        total_match = re.search(r'<opensearch:totalResults[^>]*>(\d+)<', xml_content)
+        if stats is not None and total_match:
+            stats["total"] = int(total_match.group(1))
+
+        # Simple XML parsing
+        entries = re.findall(r'<entry>(.*?)</entry>', xml_content, re.DOTALL)
+
+        for entry in entries:
+            # Extract fields using regex
+            title_match = re.search(r'<title>(.*?)</title>', entry, re.DOTALL)
+            summary_match = re.search(r'<summary>(.*?)</summary>', entry, re.DOTALL)
+            author_matches = re.findall(r'<name>(.*?)</name>', entry)
+            published_match = re.search(r'<published>(.*?)</published>', entry)
+            id_match = re.search(r'<id>(.*?)</id>', entry)
+            categories_match = re.findall(r'<category term="([^"]+)"', entry)
+
+            title = title_match.group(1).strip() if title_match else ""
+            summary = summary_match.group(1).strip() if summary_match else ""
+            authors = [a.strip() for a in author_matches]
+            published = published_match.group(1)[:10] if published_match else None  # YYYY-MM-DD
+            year = int(published[:4]) if published else None
+            arxiv_id = id_match.group(1).split("/")[-1] if id_match else ""
+            arxiv_url = f"https://arxiv.org/abs/{arxiv_id}"
+
+            papers.append({
+                "title": title,
+                "abstract": summary,
+                "authors": authors,
+                "year": year,
+                "citation_count": 0,  # arXiv doesn't have citation counts
+                "venue": "arXiv preprint",
+                "url": arxiv_url,
+                "paper_id": arxiv_id,
+                "categories": categories_match,
+                "source": "arxiv"
+            })
+
+        if len(entries) < page_size:
+            break
+        start += page_size
 
     return papers
 
@@ -124,14 +154,18 @@ def main():
     if args.categories:
         print(f"Categories: {args.categories}")
 
+    stats = {}
     papers = search_arxiv(
         args.query,
         year=args.year,
         categories=args.categories,
-        limit=args.limit
+        limit=args.limit,
+        stats=stats
     )
 
     print(f"Found {len(papers)} papers")
+    print(f"Transferred {stats.get('bytes', 0)} bytes in {stats.get('requests', 0)} requests"
+          f" ({stats.get('bytes', 0) // max(len(papers), 1)} bytes per paper)")
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
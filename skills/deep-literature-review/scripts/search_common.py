@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the search clients and the harvesting scripts.
+"""
+
+import gzip
+
+
+# Per-source paging settings: page size, deepest result reachable by one
+# query and minimum seconds between requests
+SOURCES = {
+    "arxiv": {"page_size": 50, "ceiling": 2000, "interval": 3.0},
+    "openalex": {"page_size": 200, "ceiling": 10000, "interval": 0.1},
+    "semantic_scholar": {"page_size": 100, "ceiling": 1000, "interval": 1.0},
+}
+
+
+def read_response(response, stats=None):
+    """Read a response body, decompressing gzip and recording transfer stats."""
+    raw = response.read()
+    if stats is not None:
+        stats["requests"] = stats.get("requests", 0) + 1
+        stats["bytes"] = stats.get("bytes", 0) + len(raw)
+    if response.headers.get("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return raw.decode("utf-8")
+
+
+def paper_key(paper):
+    """Identity used to merge papers from different pages, shards and runs."""
+    return (paper.get("paper_id") or paper.get("work_id")
+            or paper.get("url") or paper.get("title"))
+
+
+def fetch_page(source, query, offset, page_size, stats=None, year=None,
+               date_from=None, date_to=None, categories=None, field=None,
+               openalex_date_filter="created"):
+    """
+    Fetch one page of results through the matching search function.
+
+    Args:
+        source: "arxiv", "openalex" or "semantic_scholar"
+        query: Search query string
+        offset: Index of the first result; for OpenAlex a multiple of its page size
+        page_size: Number of results to fetch
+        stats: Optional dict that accumulates "requests" and "bytes" transferred
+        year: Year range (e.g., "2020-2024"), used when no dates are given
+        date_from: Start date (arXiv submission, S2 publication, OpenAlex
+            created or updated date)
+        date_to: End date (arXiv and Semantic Scholar only)
+        categories: arXiv categories (e.g., "cs.AI,cs.LG")
+        field: Semantic Scholar field of study
+        openalex_date_filter: "created" or "updated" for date_from on OpenAlex
+
+    Returns:
+        List of paper dictionaries
+    """
+    # Imported here because the search clients import read_response from this module
+    from search_arxiv import search_arxiv
+    from search_openalex import search_openalex
+    from search_semantic_scholar import search_semantic_scholar
+
+    if source == "arxiv":
+        return search_arxiv(
+            query,
+            year=year,
+            categories=categories,
+            limit=page_size,
+            start=offset,
+            submitted_from=date_from.strftime("%Y%m%d") if date_from else None,
+            submitted_to=date_to.strftime("%Y%m%d") if date_to else None,
+            stats=stats
+        )
+
+    if source == "openalex":
+        from_year = to_year = None
+        if year:
+            years = str(year).split("-")
+            from_year, to_year = years[0], years[-1]
+        date_filters = {}
+        if date_from:
+            date_filters[f"from_{openalex_date_filter}_date"] = date_from.isoformat()
+        # OpenAlex pages by number, so keep per_page fixed and trim the last page
+        per_page = SOURCES["openalex"]["page_size"]
+        papers = search_openalex(query, from_year=from_year, to_year=to_year,
+                                 limit=per_page, page=offset // per_page + 1,
+                                 stats=stats, **date_filters)
+        return papers[:page_size]
+
+    publication_date = None
+    if date_from or date_to:
+        publication_date = (f"{date_from.isoformat() if date_from else ''}:"
+                            f"{date_to.isoformat() if date_to else ''}")
+    return search_semantic_scholar(
+        query,
+        year=year,
+        field=field,
+        limit=page_size,
+        offset=offset,
+        publication_date=publication_date,
+        stats=stats
+    )
@@ -11,9 +11,60 @@ import urllib.request
 import urllib.parse
 import urllib.error
 
+from search_common import read_response
+
+
+# Only the fields parse_work reads
+SELECT_FIELDS = ",".join([
+    "id", "doi", "title", "publication_year", "cited_by_count", "authorships",
+    "primary_location", "open_access", "concepts", "abstract_inverted_index"
+])
+
+
+def decode_abstract(inverted_index):
+    """Rebuild abstract text from an OpenAlex abstract_inverted_index."""
+    if not inverted_index:
+        return None
+    positions = []
+    for word, indexes in inverted_index.items():
+        for index in indexes:
+            positions.append((index, word))
+    return " ".join(word for _, word in sorted(positions))
+
+
+def parse_work(work):
+    """Convert an OpenAlex work object to a paper dictionary."""
+    # Extract authors
+    authors = []
+    for author in work.get("authorships", [])[:10]:  # Limit authors
+        author_name = (author.get("author") or {}).get("display_name")
+        if author_name:
+            authors.append(author_name)
+
+    # Extract publication info
+    venue = (work.get("host_venue") or {}).get("display_name")
+    if not venue:
+        location = work.get("primary_location") or {}
+        venue = (location.get("source") or {}).get("display_name")
+
+    return {
+        "title": work.get("title"),
+        "abstract": decode_abstract(work.get("abstract_inverted_index")),
+        "authors": authors,
+        "year": work.get("publication_year"),
+        "citation_count": work.get("cited_by_count", 0),
+        "venue": venue,
+        "url": work.get("doi"),
+        "work_id": work.get("id"),
+        "source": "openalex",
+        "open_access": (work.get("open_access") or {}).get("is_oa", False),
+        "concepts": [c.get("display_name") for c in work.get("concepts", [])[:5]]
+    }
+
 
 def search_openalex(query, from_year=None, to_year=None, limit=10,
-                    peer_reviewed=False, sort_by="relevance"):
+                    peer_reviewed=False, sort_by="relevance", page=1,
+                    from_created_date=None, from_updated_date=None, stats=None):
     """
     Search OpenAlex API.
 
@@ -24,6 +75,11 @@ def search_openalex(query, from_year=None, to_year=None, limit=10,
         limit: Maximum number of results
         peer_reviewed: Only peer-reviewed papers
         sort_by: Sort order (relevance, cited, published)
+        page: First page number for pagination
+        from_created_date: Only works added on or after this date (YYYY-MM-DD)
+        from_updated_date: Only works changed on or after this date (YYYY-MM-DD)
+        stats: Optional dict that accumulates "requests" and "bytes" transferred
+            and records the reported "total" number of matches
 
     Returns:
         List of paper dictionaries
@@ -43,69 +99,62 @@ def search_openalex(query, from_year=None, to_year=None, limit=10,
     if peer_reviewed:
         filters.append("is_paratext:false")
 
-    # Build search query
-    search_query = urllib.parse.quote(query)
+    if from_created_date:
+        filters.append(f"from_created_date:{from_created_date}")
+    if from_updated_date:
+        filters.append(f"from_updated_date:{from_updated_date}")
 
+    per_page = min(limit, 200)  # API max is 200
     params = {
         "search": query,
-        "per_page": min(limit, 200),  # API max is 200
+        "per_page": per_page,
         "sort": sort_by if sort_by != "relevance" else "relevance_score:desc",
+        "select": SELECT_FIELDS,
         "mailto": "research@example.com"  # Polite pool
     }
 
     if filters:
         params["filter"] = ",".join(filters)
 
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-
     papers = []
     headers = {
         "Accept": "application/json",
+        "Accept-Encoding": "gzip",
         "User-Agent": "LiteratureReviewPlugin/0.1.0 (mailto:research@example.com)"
     }
 
-    try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            data = json.loads(response.read().decode("utf-8"))
-
-            for work in data.get("results", []):
-                # Extract authors
-                authors = []
-                for author in work.get("authorships", [])[:10]:  # Limit authors
-                    author_name = author.get("author", {}).get("display_name")
-                    if author_name:
-                        authors.append(author_name)
-
-                # Extract publication info
-                publication_year = work.get("publication_year")
-                venue = work.get("host_venue", {}).get("display_name")
-
-                papers.append({
-                    "title": work.get("title"),
-                    "abstract": work.get("abstract_inverted_index"),  # Note: inverted index format
-                    "authors": authors,
-                    "year": publication_year,
-                    "citation_count": work.get("cited_by_count", 0),
-                    "venue": venue,
-                    "url": work.get("doi"),
-                    "work_id": work.get("id"),
-                    "source": "openalex",
-                    "open_access": work.get("open_access", {}).get("is_oa", False),
-                    "concepts": [c.get("display_name") for c in work.get("concepts", [])[:5]]
-                })
-
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
-        if e.code == 429:
-            print("Rate limited. Waiting 5 seconds...", file=sys.stderr)
-            time.sleep(5)
-            return search_openalex(query, from_year, to_year, limit,
-                                   peer_reviewed, sort_by)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-
-    return papers
+    # Page until the limit is met or results run out
+    while len(papers) < limit:
+        params["page"] = page
+        url = f"{base_url}?{urllib.parse.urlencode(params)}"
+
+        try:
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req, timeout=30) as response:
+                data = json.loads(read_response(response, stats))
+        except urllib.error.HTTPError as e:
+            print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
+            if e.code == 429:
+                print("Rate limited. Waiting 5 seconds...", file=sys.stderr)
+                time.sleep(5)
+                continue
+            break
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            break
+
+        if stats is not None and "count" in data.get("meta", {}):
+            stats["total"] = data["meta"]["count"]
+
+        results = data.get("results", [])
+        for work in results:
+            papers.append(parse_work(work))
+
+        if len(results) < per_page:
+            break
+        page += 1
+
+    return papers[:limit]
 
 
 def main():
@@ -129,16 +178,20 @@ def main():
     if args.from_year or args.to_year:
         print(f"Year range: {args.from_year or 'start'}-{args.to_year or 'end'}")
 
+    stats = {}
     papers = search_openalex(
         args.query,
         from_year=args.from_year,
         to_year=args.to_year,
         limit=args.limit,
         peer_reviewed=args.peer_reviewed,
-        sort_by=args.sort
+        sort_by=args.sort,
+        stats=stats
     )
 
     print(f"Found {len(papers)} papers")
+    print(f"Transferred {stats.get('bytes', 0)} bytes in {stats.get('requests', 0)} requests"
+          f" ({stats.get('bytes', 0) // max(len(papers), 1)} bytes per paper)")
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
@@ -11,8 +11,15 @@ import urllib.request
 import urllib.parse
 import urllib.error
 
+from search_common import read_response
 
-def search_semantic_scholar(query, year=None, field=None, limit=10, offset=0):
+
+# Search results stop at offset + limit = 1000
+RESULT_CEILING = 1000
+
+
+def search_semantic_scholar(query, year=None, field=None, limit=10, offset=0,
+                            publication_date=None, stats=None):
     """
     Search Semantic Scholar API.
 
@@ -22,6 +29,9 @@ def search_semantic_scholar(query, year=None, field=None, limit=10, offset=0):
         field: Field of study (e.g., "Computer Science", "Psychology")
         limit: Maximum number of results
         offset: Offset for pagination
+        publication_date: Date range "YYYY-MM-DD:YYYY-MM-DD", overrides year
+        stats: Optional dict that accumulates "requests" and "bytes" transferred
+            and records the reported "total" number of matches
 
     Returns:
         List of paper dictionaries
@@ -30,64 +40,120 @@ def search_semantic_scholar(query, year=None, field=None, limit=10, offset=0):
 
     params = {
         "query": query,
-        "limit": min(limit, 100),  # API max is 100
-        "offset": offset,
         "fields": "title,abstract,authors,year,citationCount,venue,url,paperId"
     }
 
-    if year:
+    if publication_date:
+        params["publicationDateOrYear"] = publication_date
+    elif year:
         if "-" in str(year):
             start_year, end_year = year.split("-")
-            params["year"] = f"{start_year},{end_year}"
+            params["year"] = f"{start_year}-{end_year}"
         else:
-            params["year"] = f"{year},{year}"
+            params["year"] = str(year)
 
     if field:
-        params["fields"] += ",fieldsOfStudy"
-        # Note: Semantic Scholar doesn't support field filter directly in search
-        # We'll filter results after fetching
-
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
+        # Filtered server-side, so every returned paper counts toward the limit
+        params["fieldsOfStudy"] = field
 
     papers = []
     headers = {
-        "Accept": "application/json"
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip"
+    }
+
+    # Page until the limit is met, results run out or the offset ceiling is hit
+    while len(papers) < limit and offset < RESULT_CEILING:
+        page_size = min(limit - len(papers), 100, RESULT_CEILING - offset)  # API max is 100
+        params["limit"] = page_size
+        params["offset"] = offset
+        url = f"{base_url}?{urllib.parse.urlencode(params)}"
+
+        try:
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req, timeout=30) as response:
+                data = json.loads(read_response(response, stats))
+        except urllib.error.HTTPError as e:
+            print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
+            if e.code == 429:
+                print("Rate limited. Waiting 5 seconds...", file=sys.stderr)
+                time.sleep(5)
+                continue
+            break
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            break
+
+        if stats is not None and "total" in data:
+            stats["total"] = data["total"]
+
+        results = data.get("data", [])
+        for paper in results:
+            papers.append({
+                "title": paper.get("title"),
+                "abstract": paper.get("abstract"),
+                "authors": [a.get("name") for a in paper.get("authors", []) if a.get("name")],
+                "year": paper.get("year"),
+                "citation_count": paper.get("citationCount", 0),
+                "venue": paper.get("venue"),
+                "url": paper.get("url"),
+                "paper_id": paper.get("paperId"),
+                "source": "semantic_scholar"
+            })
+
+        if len(results) < page_size:
+            break
+        offset += page_size
+
+    return papers
+
+
+def fetch_semantic_scholar_paper(paper_id, stats=None):
+    """
+    Fetch a single paper from Semantic Scholar.
+
+    Args:
+        paper_id: Semantic Scholar id or prefixed external id
+            (e.g., "arXiv:2106.15928", "DOI:10.1145/3442188.3445922")
+        stats: Optional dict that accumulates "requests" and "bytes" transferred;
+            an HTTP error status is stored under "status", so a 404 (paper
+            not found) can be told apart from a failed request
+
+    Returns:
+        Paper dictionary, or None if the paper was not found or the request failed
+    """
+    base_url = "https://api.semanticscholar.org/graph/v1/paper/"
+    params = {"fields": "title,abstract,authors,year,citationCount,venue,url,paperId"}
+    url = f"{base_url}{urllib.parse.quote(paper_id, safe=':')}?{urllib.parse.urlencode(params)}"
+    headers = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip"
     }
 
     try:
         req = urllib.request.Request(url, headers=headers)
         with urllib.request.urlopen(req, timeout=30) as response:
-            data = json.loads(response.read().decode("utf-8"))
-
-            for paper in data.get("data", []):
-                # Filter by field if specified
-                if field:
-                    paper_fields = paper.get("fieldsOfStudy", [])
-                    if field.lower() not in [f.lower() for f in paper_fields]:
-                        continue
-
-                papers.append({
-                    "title": paper.get("title"),
-                    "abstract": paper.get("abstract"),
-                    "authors": [a.get("name") for a in paper.get("authors", []) if a.get("name")],
-                    "year": paper.get("year"),
-                    "citation_count": paper.get("citationCount", 0),
-                    "venue": paper.get("venue"),
-                    "url": paper.get("url"),
-                    "paper_id": paper.get("paperId"),
-                    "source": "semantic_scholar"
-                })
-
+            paper = json.loads(read_response(response, stats))
     except urllib.error.HTTPError as e:
+        if stats is not None:
+            stats["status"] = e.code
         print(f"HTTP Error: {e.code} - {e.reason}", file=sys.stderr)
-        if e.code == 429:
-            print("Rate limited. Waiting 5 seconds...", file=sys.stderr)
-            time.sleep(5)
-            return search_semantic_scholar(query, year, field, limit, offset)
+        return None
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
-
-    return papers
+        return None
+
+    return {
+        "title": paper.get("title"),
+        "abstract": paper.get("abstract"),
+        "authors": [a.get("name") for a in paper.get("authors", []) if a.get("name")],
+        "year": paper.get("year"),
+        "citation_count": paper.get("citationCount", 0),
+        "venue": paper.get("venue"),
+        "url": paper.get("url"),
+        "paper_id": paper.get("paperId"),
+        "source": "semantic_scholar"
+    }
 
 
 def main():
@@ -109,15 +175,19 @@ def main():
     if args.field:
         print(f"Field: {args.field}")
 
+    stats = {}
     papers = search_semantic_scholar(
         args.query,
         year=args.year,
         field=args.field,
         limit=args.limit,
-        offset=args.offset
+        offset=args.offset,
+        stats=stats
     )
 
     print(f"Found {len(papers)} papers")
+    print(f"Transferred {stats.get('bytes', 0)} bytes in {stats.get('requests', 0)} requests"
+          f" ({stats.get('bytes', 0) // max(len(papers), 1)} bytes per paper)")
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
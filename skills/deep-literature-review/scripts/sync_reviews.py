@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Keep a living review corpus up to date by fetching only new papers.
+
+Each run reads a per-query checkpoint (last harvest time and the ids seen
+in the last run per source), asks every source only for material newer
+than that checkpoint, and merges the new records into the stored corpus.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from search_common import SOURCES, fetch_page, paper_key
+
+
+def load_corpus(filepath):
+    """
+    Load the stored corpus, or an empty one on the first run.
+
+    Raises:
+        ValueError: if the file exists but is not a readable corpus, so a
+            damaged corpus is never overwritten with only the new records
+    """
+    if not os.path.exists(filepath):
+        return []
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read corpus {filepath}: {e}")
+    if isinstance(data, dict) and isinstance(data.get("papers"), list):
+        return data["papers"]
+    if isinstance(data, list):
+        return data
+    raise ValueError(f"Unknown corpus format in {filepath}")
+
+
+def load_checkpoint(filepath):
+    """Load the checkpoint file, or an empty one on the first run."""
+    if not os.path.exists(filepath):
+        return {"queries": {}}
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(filepath, data):
+    """Write JSON atomically so an interrupted run never truncates the file."""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def fetch_new(source, query, since, seen_ids, limit, options):
+    """
+    Page through results newer than since until exhausted or limit is reached.
+
+    Args:
+        source: "arxiv", "openalex" or "semantic_scholar"
+        query: Search query string
+        since: Only fetch material from this date on (None for a first full run)
+        seen_ids: Paper keys already in the corpus or seen last run
+        limit: Maximum papers to fetch
+        options: Source options (categories, field, openalex_filter)
+
+    Returns:
+        Tuple of (papers, transfer stats with "requests" and "bytes", complete)
+        where complete means paging ran until the results were exhausted,
+        rather than stopping at the limit, the ceiling or a failed request
+    """
+    page_size = SOURCES[source]["page_size"]
+    ceiling = SOURCES[source]["ceiling"]
+    papers = []
+    transfer = {"requests": 0, "bytes": 0}
+    page_index = 0
+
+    while len(papers) < limit:
+        if page_index * page_size >= ceiling:
+            return papers, transfer, False
+        if page_index:
+            time.sleep(SOURCES[source]["interval"])
+        requests_before = transfer["requests"]
+        page = fetch_page(source, query, page_index * page_size, page_size, stats=transfer,
+                          date_from=since, categories=options.get("categories"),
+                          field=options.get("field"),
+                          openalex_date_filter=options.get("openalex_filter", "created"))
+        page_index += 1
+        # The search functions return nothing on errors; only trust read responses
+        if transfer["requests"] == requests_before:
+            return papers, transfer, False
+
+        for paper in page:
+            # Updated-date syncs refresh known records, others only add new ones
+            if paper_key(paper) not in seen_ids or options.get("openalex_filter") == "updated":
+                papers.append(paper)
+        if len(page) < page_size:
+            return papers[:limit], transfer, len(papers) <= limit
+
+    return papers[:limit], transfer, False
+
+
+def merge_into_corpus(corpus_papers, new_papers):
+    """
+    Merge fetched papers into the corpus in place.
+
+    New papers are appended; papers already present are replaced by the
+    fresher record.
+
+    Returns:
+        Tuple of (added count, updated count)
+    """
+    index = {paper_key(p): i for i, p in enumerate(corpus_papers)}
+    added = updated = 0
+    for paper in new_papers:
+        key = paper_key(paper)
+        if key in index:
+            corpus_papers[index[key]] = paper
+            updated += 1
+        else:
+            index[key] = len(corpus_papers)
+            corpus_papers.append(paper)
+            added += 1
+    return added, updated
+
+
+def sync(query, corpus_path, checkpoint_path, sources, since=None, limit=500,
+         overlap_days=7, **options):
+    """
+    Run one delta sync for a query.
+
+    Args:
+        query: Search query string
+        corpus_path: Stored corpus JSON file
+        checkpoint_path: Checkpoint JSON file
+        sources: Sources to sync
+        since: Start date for sources without a checkpoint (None: no date bound)
+        limit: Maximum papers fetched per source per run
+        overlap_days: Days re-checked before the last harvest, for records
+            indexed after their submission or publication date
+        **options: Source options (categories, field, openalex_filter)
+
+    Returns:
+        Dictionary of per-source sync statistics
+
+    Raises:
+        ValueError: if the corpus file exists but cannot be loaded
+    """
+    corpus_papers = load_corpus(corpus_path)
+    checkpoint = load_checkpoint(checkpoint_path)
+    query_state = checkpoint["queries"].setdefault(query, {})
+    corpus_ids = {paper_key(p) for p in corpus_papers}
+
+    stats = {}
+    for source in sources:
+        state = query_state.get(source, {})
+        source_since = since
+        if state.get("last_harvest"):
+            last_harvest = datetime.fromisoformat(state["last_harvest"]).date()
+            source_since = last_harvest - timedelta(days=overlap_days)
+
+        seen_ids = corpus_ids | set(state.get("last_seen_ids", []))
+        started = datetime.now(timezone.utc)
+        papers, transfer, complete = fetch_new(source, query, source_since, seen_ids,
+                                               limit, options)
+        added, updated = merge_into_corpus(corpus_papers, papers)
+        corpus_ids.update(paper_key(p) for p in papers)
+
+        # Only move the checkpoint forward once everything since it was fetched;
+        # otherwise the next run starts from the same point again
+        query_state[source] = {
+            "last_harvest": started.isoformat() if complete else state.get("last_harvest"),
+            "last_seen_ids": [paper_key(p) for p in papers]
+        }
+        stats[source] = {"since": source_since.isoformat() if source_since else None,
+                         "requests": transfer["requests"], "bytes": transfer["bytes"],
+                         "added": added, "updated": updated, "complete": complete}
+        print(f"{source}: {added} new, {updated} updated since "
+              f"{stats[source]['since'] or 'start'} "
+              f"({transfer['requests']} requests, {transfer['bytes']} bytes)")
+        if not complete:
+            print(f"Warning: {source} stopped early (limit, result ceiling or failed "
+                  f"request); checkpoint not advanced", file=sys.stderr)
+
+    write_json(corpus_path, {
+        "query": query,
+        "last_sync": datetime.now(timezone.utc).isoformat(),
+        "count": len(corpus_papers),
+        "papers": corpus_papers
+    })
+    # Checkpoint last, so a crash before this point re-fetches rather than skips
+    write_json(checkpoint_path, checkpoint)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch only papers new since the last run and merge them into a corpus"
+    )
+    parser.add_argument("query", help="Search query")
+    parser.add_argument("--corpus", required=True, help="Corpus JSON file to update")
+    parser.add_argument("--checkpoint",
+                       help="Checkpoint file (default: <corpus>.checkpoint.json)")
+    parser.add_argument("--sources", default="arxiv,openalex,semantic_scholar",
+                       help="Comma-separated sources")
+    parser.add_argument("--since", type=date.fromisoformat,
+                       help="Start date (YYYY-MM-DD) for sources without a checkpoint")
+    parser.add_argument("--limit", type=int, default=500,
+                       help="Maximum papers per source per run")
+    parser.add_argument("--overlap-days", type=int, default=7,
+                       help="Days before the last harvest to re-check for late-indexed records")
+    parser.add_argument("--categories", help="arXiv categories (e.g., cs.AI,cs.LG)")
+    parser.add_argument("--field", help="Semantic Scholar field of study")
+    parser.add_argument("--openalex-filter", default="created",
+                       choices=["created", "updated"],
+                       help="Use OpenAlex from_created_date or from_updated_date")
+    parser.add_argument("--watch", type=float, metavar="HOURS",
+                       help="Keep running and sync every HOURS hours")
+
+    args = parser.parse_args()
+
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        print(f"Error: Unknown sources: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    checkpoint_path = args.checkpoint or str(Path(args.corpus).with_suffix(".checkpoint.json"))
+
+    while True:
+        print(f"Syncing {args.corpus} for: {args.query}")
+        try:
+            sync(
+                args.query,
+                args.corpus,
+                checkpoint_path,
+                sources,
+                since=args.since,
+                limit=args.limit,
+                overlap_days=args.overlap_days,
+                categories=args.categories,
+                field=args.field,
+                openalex_filter=args.openalex_filter
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Corpus saved to {args.corpus}")
+        if not args.watch:
+            break
+        time.sleep(args.watch * 3600)
+
+
+if __name__ == "__main__":
+    main()